@@ -1,11 +1,13 @@
 """The cacher module contains the Cacher class."""
 
 import glob
+import json
 import os
 import pickle
 import sys
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any, Callable, Dict, Literal, TypedDict
+from typing import Any, Literal, TypedDict
 
 import numpy as np
 
@@ -50,17 +52,29 @@ class CacheArgs(TypedDict):
             - ".npy": The storage type is a NumPy file.
             - ".parquet": The storage type is a Parquet file.
             - ".csv": The storage type is a CSV file.
-            - ".npy_stack": The storage type is a NumPy stack.
+            - ".feather": The storage type is a Feather (Arrow IPC) file.
+            - ".npy_stack": The storage type is a NumPy stack. It only counts as cached once its metadata sidecar is written after the last chunk.
+            - ".zarr": The storage type is a compressed Zarr array, written with zarr's default (Blosc) compressor unless one is given in store_args.
+              It only counts as cached once its metadata sidecar is written after the last chunk.
+              If store_in_background is set and a dask.distributed client is active, a TransformationBlock writes dask arrays in the background.
             - ".pkl": The storage type is a pickle file.
         - storage_path: The path to the storage.
         - read_args: The arguments for reading the data.
         - store_args: The arguments for storing the data.
+        - fingerprint_input: Whether to include a fingerprint of the input data in the cache name of a TransformationBlock.
+        - in_memory: Whether a TransformationBlock also keeps its most recent outputs in memory, in front of the disk cache.
+          Hits return the same object, so do not modify it in place.
+        - store_in_background: Whether a TransformationBlock writes a dask array .zarr cache in the background on the active dask.distributed client.
+          The write is cancelled if the returned data is released before it finishes. The partial store then does not count as cached and is overwritten by the next store.
 
     :param output_data_type: The type of the output data.
     :param storage_type: The type of the storage.
     :param storage_path: The path to the storage.
     :param read_args: The optional additional arguments for reading the data.
     :param store_args: The optional additional arguments for storing the data.
+    :param fingerprint_input: Optionally reuse the cache only for identical input data, also across pipelines.
+    :param in_memory: Optionally skip reading from disk for recently used outputs.
+    :param store_in_background: Optionally continue with the transformed data while the .zarr cache is still being written.
     """
 
     output_data_type: Literal[
@@ -70,16 +84,61 @@ class CacheArgs(TypedDict):
         "dask_dataframe",
         "polars_dataframe",
     ]
-    storage_type: Literal[".npy", ".parquet", ".csv", ".npy_stack", ".pkl"]
+    storage_type: Literal[".npy", ".parquet", ".csv", ".feather", ".npy_stack", ".zarr", ".pkl"]
     storage_path: str
     read_args: NotRequired[dict[str, Any]]
     store_args: NotRequired[dict[str, Any]]
+    fingerprint_input: NotRequired[bool]
+    in_memory: NotRequired[bool]
+    store_in_background: NotRequired[bool]
 
 
+CACHE_META_FILE = ".meta.json"
+
 LoaderFunction = Callable[[str, Path, str, Any], Any]
 StoreFunction = Callable[[str, Path, Any, str, Any], Any]
 
 
+def _distributed_client_active() -> bool:
+    """Check whether a dask.distributed client is active, so that work can be submitted without blocking.
+
+    :return: True if a client is active, False otherwise.
+    """
+    try:
+        from distributed import default_client
+
+        default_client()
+    except (ImportError, ValueError):
+        return False
+    return True
+
+
+def _cache_meta(name: str, data: Any) -> dict[str, Any]:  # noqa: ANN401
+    """Get the metadata of a stored array for the sidecar of its cache directory.
+
+    :param name: The name of the cache.
+    :param data: The stored array.
+    :return: The metadata.
+    """
+    meta: dict[str, Any] = {"name": name, "shape": list(data.shape), "dtype": str(data.dtype)}
+    if hasattr(data, "chunks"):
+        meta["chunks"] = [list(c) for c in data.chunks]
+    return meta
+
+
+def _write_cache_meta(cache_dir: Path, meta: dict[str, Any], *_writes: Any) -> None:
+    """Write the metadata sidecar of a cache directory atomically, after all of its chunks are written.
+
+    :param cache_dir: The directory of the cache.
+    :param meta: The metadata of the stored array.
+    :param _writes: The results of the chunk writes, only passed so that a dask task runs after them.
+    """
+    tmp_path = cache_dir / f"{CACHE_META_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, cache_dir / CACHE_META_FILE)
+
+
 class Cacher(Logger):
     """The cacher is a flexible class that allows for caching of any data.
 
@@ -123,17 +182,16 @@ class Cacher(Logger):
         # Check if path exists
         path_exists = False
 
-        if storage_type == ".npy":
-            path_exists = os.path.exists(storage_path + name + ".npy")
-        elif storage_type == ".parquet":
-            path_exists = os.path.exists(storage_path + name + ".parquet")
+        if storage_type in {".npy", ".parquet", ".feather", ".pkl"}:
+            # These are stored in a single file or directory named after the storage type
+            path_exists = os.path.exists(storage_path + name + storage_type)
         elif storage_type == ".csv":
             # Check if the file exists or if there are any parts inside the folder
             path_exists = os.path.exists(storage_path + name + ".csv") or glob.glob(storage_path + name + "/*.part") != []
         elif storage_type == ".npy_stack":
-            path_exists = os.path.exists(storage_path + name)
-        elif storage_type == ".pkl":
-            path_exists = os.path.exists(storage_path + name + ".pkl")
+            path_exists = self._cache_complete(name, Path(storage_path) / name)
+        elif storage_type == ".zarr":
+            path_exists = self._cache_complete(name, Path(storage_path) / f"{name}.zarr")
 
         self.log_to_debug(
             f"Cache exists is {path_exists} for type: {storage_type} and path: {storage_path}",
@@ -141,6 +199,20 @@ class Cacher(Logger):
 
         return path_exists
 
+    def _cache_complete(self, name: str, cache_dir: Path) -> bool:
+        """Check if a cache directory (NumPy stack or Zarr array) was completely written for this cache name.
+
+        :param name: The name of the cache.
+        :param cache_dir: The directory of the cache.
+        :return: True if the metadata sidecar exists and belongs to name, False otherwise.
+        """
+        try:
+            with open(cache_dir / CACHE_META_FILE) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get("name") == name
+
     def _get_cache(self, name: str, cache_args: CacheArgs | None = None) -> Any:  # noqa: ANN401
         """Load the cache.
 
@@ -168,11 +240,13 @@ class Cacher(Logger):
         output_data_type = cache_args["output_data_type"]
         read_args = cache_args.get("read_args", {})
 
-        load_functions: Dict[str, LoaderFunction] = {
+        load_functions: dict[str, LoaderFunction] = {
             ".npy": self._load_npy,
             ".parquet": self._load_parquet,
             ".csv": self._load_csv,
+            ".feather": self._load_feather,
             ".npy_stack": self._load_npy_stack,
+            ".zarr": self._load_zarr,
             ".pkl": self._load_pkl,
         }
 
@@ -181,7 +255,7 @@ class Cacher(Logger):
 
         self.log_to_debug(f"Invalid storage type: {storage_type}")
         raise ValueError(
-            "storage_type must be .npy, .parquet, .csv, or .npy_stack, other types not supported yet",
+            "storage_type must be .npy, .parquet, .csv, .feather, .npy_stack, .zarr, or .pkl, other types not supported yet",
         )
 
     def _load_npy(self, name: str, storage_path: Path, output_data_type: str, read_args: Any) -> Any:  # noqa: ANN401
@@ -190,7 +264,8 @@ class Cacher(Logger):
         if output_data_type == "numpy_array":
             return np.load(storage_path / f"{name}.npy", **read_args)
         if output_data_type == "dask_array":
-            return da.from_array(np.load(storage_path / f"{name}.npy"), **read_args)
+            # Memory-map the file so chunks are only read from disk when they are computed
+            return da.from_array(np.load(storage_path / f"{name}.npy", mmap_mode="r"), **read_args)
 
         self.log_to_debug(
             f"Invalid output data type: {output_data_type}, for loading .npy file.",
@@ -243,6 +318,21 @@ class Cacher(Logger):
             "output_data_type must be pandas_dataframe, dask_dataframe, or polars_dataframe, other types not supported yet",
         )
 
+    def _load_feather(self, name: str, storage_path: Path, output_data_type: str, read_args: Any) -> Any:  # noqa: ANN401
+        # Check if output_data_type is supported and load cache to output_data_type
+        self.log_to_debug(f"Loading .feather file from {storage_path}/{name}.feather")
+        if output_data_type == "pandas_dataframe":
+            return pd.read_feather(storage_path / f"{name}.feather", **read_args)
+        if output_data_type == "polars_dataframe":
+            return pl.read_ipc(storage_path / f"{name}.feather", **read_args)
+
+        self.log_to_debug(
+            f"Invalid output data type: {output_data_type}, for loading .feather file.",
+        )
+        raise ValueError(
+            "output_data_type must be pandas_dataframe or polars_dataframe, other types not supported yet",
+        )
+
     def _load_npy_stack(self, name: str, storage_path: Path, output_data_type: str, read_args: Any) -> Any:  # noqa: ANN401
         # Check if output_data_type is supported and load cache to output_data_type
         self.log_to_debug(f"Loading .npy_stack file from {storage_path / name}")
@@ -256,6 +346,21 @@ class Cacher(Logger):
             "output_data_type must be dask_array, other types not supported yet",
         )
 
+    def _load_zarr(self, name: str, storage_path: Path, output_data_type: str, read_args: Any) -> Any:  # noqa: ANN401
+        # Check if output_data_type is supported and load cache to output_data_type
+        self.log_to_debug(f"Loading .zarr file from {storage_path}/{name}.zarr")
+        if output_data_type == "dask_array":
+            return da.from_zarr(storage_path / f"{name}.zarr", **read_args)
+        if output_data_type == "numpy_array":
+            return da.from_zarr(storage_path / f"{name}.zarr", **read_args).compute()
+
+        self.log_to_debug(
+            f"Invalid output data type: {output_data_type}, for loading .zarr file.",
+        )
+        raise ValueError(
+            "output_data_type must be dask_array or numpy_array, other types not supported yet",
+        )
+
     def _load_pkl(self, name: str, storage_path: Path, _output_data_type: str, read_args: Any) -> Any:  # noqa: ANN401
         # Load the pickle file
         self.log_to_debug(
@@ -264,12 +369,14 @@ class Cacher(Logger):
         with open(storage_path / f"{name}.pkl", "rb") as file:
             return pickle.load(file, **read_args)  # noqa: S301
 
-    def _store_cache(self, name: str, data: Any, cache_args: CacheArgs | None = None) -> None:  # noqa: ANN401
+    def _store_cache(self, name: str, data: Any, cache_args: CacheArgs | None = None, *, background: bool = False) -> Any:  # noqa: ANN401
         """Store one set of data.
 
         :param name: The name of the cache.
         :param data: The data to store.
         :param cache_args: The cache arguments.
+        :param background: Whether the caller keeps the returned data, so that a .zarr cache of a dask array may be written in the background.
+        :return: The stored data if it is still being written in the background, otherwise None.
         """
         if not cache_args:
             raise ValueError("cache_args is empty")
@@ -284,19 +391,24 @@ class Cacher(Logger):
         output_data_type = cache_args["output_data_type"]
         store_args = cache_args.get("store_args", {})
 
-        store_functions: Dict[str, StoreFunction] = {
+        store_functions: dict[str, StoreFunction] = {
             ".npy": self._store_npy,
             ".parquet": self._store_parquet,
             ".csv": self._store_csv,
+            ".feather": self._store_feather,
             ".npy_stack": self._store_npy_stack,
+            ".zarr": self._store_zarr,
             ".pkl": self._store_pkl,
         }
 
+        if background and storage_type == ".zarr" and output_data_type == "dask_array" and _distributed_client_active():
+            return self._store_zarr_background(name, storage_path, data, store_args)
+
         if storage_type in store_functions:
             return store_functions[storage_type](name, storage_path, data, output_data_type, store_args)
 
         self.log_to_debug(f"Invalid storage type: {storage_type}")
-        raise ValueError(f"storage_type is {storage_type} must be .npy, .parquet, .csv, .npy_stack, or .pkl, other types not supported yet")
+        raise ValueError(f"storage_type is {storage_type} must be .npy, .parquet, .csv, .feather, .npy_stack, .zarr, or .pkl, other types not supported yet")
 
     def _store_npy(self, name: str, storage_path: Path, data: Any, output_data_type: str, store_args: Any) -> None:  # noqa: ANN401
         file_path = storage_path / f"{name}.npy"
@@ -347,6 +459,16 @@ class Cacher(Logger):
         else:
             raise ValueError("output_data_type must be pandas_dataframe, dask_dataframe, or polars_dataframe")
 
+    def _store_feather(self, name: str, storage_path: Path, data: Any, output_data_type: str, store_args: Any) -> None:  # noqa: ANN401
+        file_path = storage_path / f"{name}.feather"
+        self.log_to_debug(f"Storing .feather file to {file_path}")
+        if output_data_type == "pandas_dataframe":
+            data.to_feather(file_path, **store_args)
+        elif output_data_type == "polars_dataframe":
+            data.write_ipc(file_path, **store_args)
+        else:
+            raise ValueError("output_data_type must be pandas_dataframe or polars_dataframe")
+
     def _store_npy_stack(self, name: str, storage_path: Path, data: Any, output_data_type: str, store_args: Any) -> None:  # noqa: ANN401
         # Handling npy_stack case differently as it might need a different path structure
         storage_path /= name  # Treat name as a directory here
@@ -356,6 +478,37 @@ class Cacher(Logger):
         else:
             raise ValueError("output_data_type must be dask_array")
 
+        # Write the sidecar last, so a partially written stack is never seen as a cache hit
+        _write_cache_meta(storage_path, _cache_meta(name, data))
+
+    def _store_zarr(self, name: str, storage_path: Path, data: Any, output_data_type: str, store_args: Any) -> None:  # noqa: ANN401
+        file_path = storage_path / f"{name}.zarr"
+        self.log_to_debug(f"Storing .zarr file to {file_path}")
+        # A store without sidecar was not completely written, so it is overwritten instead of raising that it already contains an array
+        store_args = {"overwrite": True, **store_args}
+        if output_data_type == "dask_array":
+            data.to_zarr(file_path, **store_args)
+        elif output_data_type == "numpy_array":
+            da.from_array(data).to_zarr(file_path, **store_args)
+        else:
+            raise ValueError("output_data_type must be dask_array or numpy_array")
+
+        # to_zarr creates the array metadata before any chunk, so the sidecar marks the write as complete
+        _write_cache_meta(file_path, _cache_meta(name, data))
+
+    def _store_zarr_background(self, name: str, storage_path: Path, data: Any, store_args: Any) -> Any:  # noqa: ANN401
+        file_path = storage_path / f"{name}.zarr"
+        self.log_to_debug(f"Storing .zarr file to {file_path} in the background")
+        from dask import delayed
+        from dask.graph_manipulation import bind
+
+        # The sidecar task depends on every chunk write, and persisting it starts the write on the cluster.
+        # Like in _store_zarr, an incomplete store of an earlier write is overwritten.
+        write = data.to_zarr(file_path, compute=False, **{"overwrite": True, **store_args})
+        written = delayed(_write_cache_meta)(file_path, _cache_meta(name, data), write).persist()
+        # The returned array reads the stored chunks once the write is complete and holds on to it until then
+        return bind(da.from_zarr(file_path), written)
+
     def _store_pkl(self, name: str, storage_path: Path, data: Any, _output_data_type: str, store_args: Any) -> None:  # noqa: ANN401
         file_path = storage_path / f"{name}.pkl"
         self.log_to_debug(f"Storing pickle file to {file_path}")
@@ -11,6 +11,7 @@ from epochalyst.training.augmentation.time_series_augmentations import (
     RandomPhaseShift,
     SubtractChannels,
 )
+from epochalyst.training.augmentation.utils import AudiomentationsCompose, CustomApplyOne, CustomSequential, NoOp
 
 __all__ = [
     "CutMix",
@@ -23,4 +24,8 @@ __all__ = [
     "RandomAmplitudeShift",
     "SubtractChannels",
     "AddBackgroundNoiseWrapper",
+    "CustomApplyOne",
+    "CustomSequential",
+    "NoOp",
+    "AudiomentationsCompose",
 ]
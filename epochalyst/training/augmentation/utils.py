@@ -6,14 +6,37 @@ Classes:
 - NoOp: A class representing a no-operation augmentation.
 """
 
+import bisect
+import copy
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from types import ModuleType
-from typing import Any
+from typing import Any, Literal
 
+import numpy as np
+import numpy.typing as npt
 import torch
 
 from epochalyst.training.utils.recursive_repr import recursive_repr
 
+# Thread pools for augmenting the samples of a batch concurrently, by process id
+_AUGMENTATION_POOLS: dict[int, ThreadPoolExecutor] = {}
+
+
+def _get_augmentation_pool() -> ThreadPoolExecutor:
+    """Return the thread pool of the current process, creating it on first use.
+
+    A forked child (e.g. a DataLoader worker) inherits the pool of its parent without its threads, so it gets a pool of its own.
+
+    :return: The thread pool of the current process.
+    """
+    pid = os.getpid()
+    if pid not in _AUGMENTATION_POOLS:
+        _AUGMENTATION_POOLS[pid] = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _AUGMENTATION_POOLS[pid]
+
 
 def get_audiomentations() -> ModuleType:
     """Return audiomentations module.
@@ -33,6 +56,24 @@ def get_audiomentations() -> ModuleType:
         return audiomentations
 
 
+def get_torch_audiomentations() -> ModuleType:
+    """Return torch_audiomentations module.
+
+    :raises ImportError: If torch_audiomentations is not installed.
+    :return: torch_audiomentations module.
+    """
+    try:
+        import torch_audiomentations
+
+    except ImportError:
+        raise ImportError(
+            "If you want to use the gpu backend you must install torch-audiomentations",
+        ) from None
+
+    else:
+        return torch_audiomentations
+
+
 @dataclass
 class CustomApplyOne:
     """Custom sequential class for augmentations."""
@@ -43,19 +84,22 @@ class CustomApplyOne:
 
     def __post_init__(self) -> None:
         """Post initialization function of CustomApplyOne."""
-        self.probabilities = []
-        if self.x_transforms is not None:
-            for transform in self.x_transforms:
-                self.probabilities.append(transform.p)
-        if self.xy_transforms is not None:
-            for transform in self.xy_transforms:
-                self.probabilities.append(transform.p)
+        self.all_transforms = (*self.x_transforms, *self.xy_transforms)
+        self.probabilities = np.fromiter((transform.p for transform in self.all_transforms), dtype=np.float64, count=len(self.all_transforms))
 
         # Make tensor from probs
-        self.probabilities_tensor = torch.tensor(self.probabilities)
+        self.probabilities_tensor = torch.tensor(self.probabilities, dtype=torch.float32)
         # Ensure sum is 1
         self.probabilities_tensor /= self.probabilities_tensor.sum()
-        self.all_transforms = self.x_transforms + self.xy_transforms
+        # Normalized cumulative distribution for sampling on the CPU without a torch kernel launch.
+        # Stored as a tuple of floats, since bisect on it is much cheaper per call than np.searchsorted on a tiny array.
+        cdf = np.cumsum(self.probabilities / self.probabilities.sum())
+        if cdf.size:
+            cdf[-1] = 1.0
+        self._cdf = tuple(cdf.tolist())
+        # Kind of each transform in all_transforms, so dispatch does not need membership tests.
+        # NoOps keep their probability of being selected, but are not called.
+        self._kinds = tuple("noop" if isinstance(transform, NoOp) else "x" for transform in self.x_transforms) + ("xy",) * len(self.xy_transforms)
 
     def __call__(
         self,
@@ -68,19 +112,12 @@ class CustomApplyOne:
         :param y: Input labels
         :return: Augmented features and labels
         """
-        transform = self.all_transforms[
-            int(
-                torch.multinomial(
-                    self.probabilities_tensor,
-                    1,
-                    replacement=False,
-                ).item(),
-            )
-        ]
-        if transform in self.x_transforms:
-            x = transform(x)
-        if transform in self.xy_transforms:
-            x, y = transform(x, y)
+        idx = bisect.bisect_right(self._cdf, np.random.random())  # noqa: NPY002 (global state respects np.random.seed)
+        kind = self._kinds[idx]
+        if kind == "x":
+            x = self.all_transforms[idx](x)
+        elif kind == "xy":
+            x, y = self.all_transforms[idx](x, y)
         return x, y
 
 
@@ -89,10 +126,52 @@ class CustomSequential:
     """Custom sequential class for augmentations.
 
     This class applies augmentations sequentially without probabilities.
+    NoOps in x_transforms are skipped.
+
+    If script is set and all other x_transforms are scriptable torch modules, they are applied as a single scripted torch.nn.Sequential.
+    Scripting copies the modules once, so later changes to the given instances (e.g. eval(), attributes or .to(device)) are not followed.
     """
 
     x_transforms: list[Any] = field(default_factory=list)
     xy_transforms: list[Any] = field(default_factory=list)
+    script: bool = field(default=False, repr=False)
+    _active_x_transforms: list[Any] = field(default_factory=list, init=False, repr=False, compare=False)
+    _x_sequential: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Post initialization function of CustomSequential."""
+        self._active_x_transforms = [transform for transform in self.x_transforms if not isinstance(transform, NoOp)]
+        self._x_sequential = self._script_x_transforms()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Get the state for pickling without the scripted module, since it can not be pickled.
+
+        :return: The state of the object.
+        """
+        state = self.__dict__.copy()
+        state["_x_sequential"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the state after unpickling and script the x_transforms again.
+
+        :param state: The state of the object.
+        """
+        self.__dict__.update(state)
+        self._x_sequential = self._script_x_transforms()
+
+    def _script_x_transforms(self) -> torch.jit.ScriptModule | None:
+        """Script the active x_transforms into a single torch.nn.Sequential.
+
+        :return: The scripted module, or None if script is not set or the x_transforms can not be scripted.
+        """
+        if not self.script or not self._active_x_transforms or not all(isinstance(transform, torch.nn.Module) for transform in self._active_x_transforms):
+            return None
+        try:
+            return torch.jit.script(torch.nn.Sequential(*self._active_x_transforms))
+        except Exception:  # noqa: BLE001
+            # Many augmentations use Python control flow or override __call__ instead of forward, fall back to the loop
+            return None
 
     def __call__(
         self,
@@ -105,12 +184,13 @@ class CustomSequential:
         :param y: input labels.
         :return: Augmented features and labels.
         """
-        if self.x_transforms is not None:
-            for transform in self.x_transforms:
+        if self._x_sequential is not None:
+            x = self._x_sequential(x)
+        else:
+            for transform in self._active_x_transforms:
                 x = transform(x)
-        if self.xy_transforms is not None:
-            for transform in self.xy_transforms:
-                x, y = transform(x, y)
+        for transform in self.xy_transforms:
+            x, y = transform(x, y)
         return x, y
 
 
@@ -139,21 +219,52 @@ class NoOp(torch.nn.Module):
 
 @dataclass
 class AudiomentationsCompose:
-    """Wrapper class to be used for audiomentations Compose augmentation. Needed for consistent repr."""
+    """Wrapper class to be used for audiomentations Compose augmentation. Needed for consistent repr.
 
-    compose: get_audiomentations().Compose = None  # type: ignore[valid-type]
+    If parallel is set, the samples of a batch are augmented concurrently on a shared thread pool.
+    Audiomentations transforms store their random parameters on the instance, so every thread uses its own copy of the compose.
+    Note that the order of random draws, and therefore the result, is then not reproducible with a fixed seed.
+
+    If backend is "gpu", compose must be a torch_audiomentations Compose instead.
+    The batch of shape (N,C,L) is then augmented as a whole on the device of the input tensor, without converting to numpy.
+    """
+
+    compose: Any = None  # audiomentations.Compose or torch_audiomentations.Compose, not annotated so importing this module stays lazy
     sr: int = 32000
+    parallel: bool = False
+    backend: Literal["cpu", "gpu"] = "cpu"
+    _thread_composes: dict[int, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def __call__(self, x: torch.Tensor) -> torch.Tensor:
         """Apply the compose augmentation to the input signal."""
-        augmented_x = x.clone()
-        for i in range(x.shape[0]):
-            augmented_x[i] = torch.from_numpy(self.compose(x[i].squeeze().numpy(), self.sr))
-        return augmented_x
+        if self.backend == "gpu":
+            augmented = self.compose(samples=x, sample_rate=self.sr)
+            # torch_audiomentations returns an ObjectDict when output_type is "dict"
+            return augmented if isinstance(augmented, torch.Tensor) else augmented.samples
+
+        # Convert the whole batch once and augment numpy views of each sample
+        x_np = x.numpy()
+        augmented = _get_augmentation_pool().map(self._augment_sample_threaded, x_np) if self.parallel else (self.compose(sample.squeeze(), self.sr) for sample in x_np)
+        # Write every augmented sample straight into a single output array, which torch then wraps without copying
+        augmented_x = np.empty_like(x_np)
+        for i, sample in enumerate(augmented):
+            augmented_x[i] = sample
+        return torch.from_numpy(augmented_x)
+
+    def _augment_sample_threaded(self, sample: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        """Apply the compose augmentation to a single sample using the compose copy of the current thread.
+
+        :param sample: The input sample.
+        :return: The augmented sample.
+        """
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_composes:
+            self._thread_composes[thread_id] = copy.deepcopy(self.compose)
+        return self._thread_composes[thread_id](sample.squeeze(), self.sr)
 
     def __repr__(self) -> str:
         """Create a repr for the AudiomentationsCompose class. Needed for consistent repr."""
         out = ""
-        for _field in self.compose.__dict__["transforms"]:
+        for _field in self.compose.transforms:
             out += recursive_repr(_field)
         return out
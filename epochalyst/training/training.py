@@ -22,12 +22,13 @@ class TrainingPipeline(TrainingSystem, Cacher):
         :param y: The expected output of the system.
         :return: The input and output of the system.
         """
-        if cache_args and self.cache_exists(name=self.get_hash() + "x", cache_args=cache_args) and self.cache_exists(name=self.get_hash() + "y", cache_args=cache_args):
+        pipeline_hash = self.get_hash()
+        if cache_args and self.cache_exists(name=pipeline_hash + "x", cache_args=cache_args) and self.cache_exists(name=pipeline_hash + "y", cache_args=cache_args):
             self.log_to_terminal(
-                f"Cache exists for training pipeline with hash: {self.get_hash()}. Using the cache.",
+                f"Cache exists for training pipeline with hash: {pipeline_hash}. Using the cache.",
             )
-            x = self._get_cache(name=self.get_hash() + "x", cache_args=cache_args)
-            y = self._get_cache(name=self.get_hash() + "y", cache_args=cache_args)
+            x = self._get_cache(name=pipeline_hash + "x", cache_args=cache_args)
+            y = self._get_cache(name=pipeline_hash + "y", cache_args=cache_args)
             return x, y
 
         if self.get_steps():
@@ -52,10 +53,11 @@ class TrainingPipeline(TrainingSystem, Cacher):
                 self.log_to_debug(f"{step} is not given cache_args")
                 continue
 
+            step_hash = step.get_hash()
             step_cache_exists = step.cache_exists(
-                step.get_hash() + "x",
+                step_hash + "x",
                 step_cache_args,
-            ) and step.cache_exists(step.get_hash() + "y", step_cache_args)
+            ) and step.cache_exists(step_hash + "y", step_cache_args)
             if step_cache_exists:
                 self.log_to_debug(
                     f"Cache exists for {step}, moving index of steps to {i}",
@@ -66,8 +68,8 @@ class TrainingPipeline(TrainingSystem, Cacher):
 
         if cache_args:
             self.log_to_terminal(f"Storing cache for x and y to {cache_args['storage_path']}")
-            self._store_cache(name=self.get_hash() + "x", data=x, cache_args=cache_args)
-            self._store_cache(name=self.get_hash() + "y", data=y, cache_args=cache_args)
+            self._store_cache(name=pipeline_hash + "x", data=x, cache_args=cache_args)
+            self._store_cache(name=pipeline_hash + "y", data=y, cache_args=cache_args)
 
         # Set steps to original in case class is called again (case: train -> predict)
         self.steps = self.all_steps
@@ -81,8 +83,9 @@ class TrainingPipeline(TrainingSystem, Cacher):
         :param cache_args: The cache arguments.
         :return: The output of the system.
         """
-        if cache_args and self.cache_exists(self.get_hash() + "p", cache_args):
-            return self._get_cache(self.get_hash() + "p", cache_args)
+        name = self.get_hash() + "p"
+        if cache_args and self.cache_exists(name, cache_args):
+            return self._get_cache(name, cache_args)
 
         if self.get_steps():
             self.log_section_separator("Prediction Pipeline")
@@ -120,7 +123,7 @@ class TrainingPipeline(TrainingSystem, Cacher):
 
         if cache_args:
             self.log_to_terminal(f"Storing cache for x to {cache_args['storage_path']}")
-            self._store_cache(self.get_hash() + "p", x, cache_args)
+            self._store_cache(name, x, cache_args)
 
         # Set steps to original in case class is called again
         self.steps = self.all_steps
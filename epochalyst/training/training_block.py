@@ -66,25 +66,28 @@ class TrainingBlock(Trainer, Cacher):
         :param cache_args: The cache arguments.
         :return: The predicted data and the labels
         """
-        if cache_args and self.cache_exists(name=self.get_hash() + "x", cache_args=cache_args) and self.cache_exists(name=self.get_hash() + "y", cache_args=cache_args):
+        block_hash = self.get_hash()
+        if cache_args and self.cache_exists(name=block_hash + "x", cache_args=cache_args) and self.cache_exists(name=block_hash + "y", cache_args=cache_args):
             self.log_to_terminal(
-                f"Cache exists for {self.__class__} with hash: {self.get_hash()}. Using the cache.",
+                f"Cache exists for {self.__class__} with hash: {block_hash}. Using the cache.",
             )
-            x = self._get_cache(name=self.get_hash() + "x", cache_args=cache_args)
-            y = self._get_cache(name=self.get_hash() + "y", cache_args=cache_args)
+            x = self._get_cache(name=block_hash + "x", cache_args=cache_args)
+            y = self._get_cache(name=block_hash + "y", cache_args=cache_args)
             return x, y
 
         x, y = self.custom_train(x, y, **train_args)
 
         if cache_args:
+            # The hash can change while training, e.g. when a fold is set, so get it again
+            block_hash = self.get_hash()
             self.log_to_terminal(f"Storing cache for x and y to {cache_args['storage_path']}")
             self._store_cache(
-                name=self.get_hash() + "x",
+                name=block_hash + "x",
                 data=x,
                 cache_args=cache_args,
             )
             self._store_cache(
-                name=self.get_hash() + "y",
+                name=block_hash + "y",
                 data=y,
                 cache_args=cache_args,
             )
@@ -110,11 +113,12 @@ class TrainingBlock(Trainer, Cacher):
         :param cache_args: The cache arguments.
         :return: The predicted data.
         """
+        name = self.get_hash() + "p"
         if cache_args and self.cache_exists(
-            name=self.get_hash() + "p",
+            name=name,
             cache_args=cache_args,
         ):
-            return self._get_cache(name=self.get_hash() + "p", cache_args=cache_args)
+            return self._get_cache(name=name, cache_args=cache_args)
 
         x = self.custom_predict(x, **pred_args)
 
@@ -67,11 +67,12 @@ class TransformationPipeline(TransformingSystem, Cacher):
         :param cache_args: The cache arguments.
         :return: The transformed data.
         """
-        if cache_args and self.cache_exists(self.get_hash(), cache_args):
+        pipeline_hash = self.get_hash()
+        if cache_args and self.cache_exists(pipeline_hash, cache_args):
             self.log_to_terminal(
-                f"Cache exists for {self.title} with hash: {self.get_hash()}. Using the cache.",
+                f"Cache exists for {self.title} with hash: {pipeline_hash}. Using the cache.",
             )
-            return self._get_cache(self.get_hash(), cache_args)
+            return self._get_cache(pipeline_hash, cache_args)
 
         if self.get_steps():
             self.log_section_separator(self.title)
@@ -106,7 +107,7 @@ class TransformationPipeline(TransformingSystem, Cacher):
 
         if cache_args:
             self.log_to_terminal(f"Storing cache for pipeline to {cache_args['storage_path']}")
-            self._store_cache(self.get_hash(), data, cache_args)
+            self._store_cache(pipeline_hash, data, cache_args)
 
         # Set steps to original in case class is called again
         self.steps = self.all_steps
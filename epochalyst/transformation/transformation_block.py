@@ -1,12 +1,17 @@
 """TransformationBlock module than can be extended by implementing the custom_transform method."""
 
+import hashlib
 from abc import abstractmethod
+from collections import OrderedDict
 from typing import Any
 
 from agogos.transforming import Transformer
+from joblib import hash
 
 from epochalyst.caching.cacher import CacheArgs, Cacher
 
+MEMORY_CACHE_SIZE = 4
+
 
 class TransformationBlock(Transformer, Cacher):
     """The transformation block is a flexible block that allows for transformation of any data.
@@ -55,6 +60,11 @@ class TransformationBlock(Transformer, Cacher):
         data = custom_transformation_block.transform(data, cache=cache_args)
     """
 
+    def __post_init__(self) -> None:
+        """Initialize the block and its in-memory cache."""
+        super().__post_init__()
+        self._memory_cache: OrderedDict[tuple[str, ...], Any] = OrderedDict()
+
     def transform(self, data: Any, cache_args: CacheArgs | None = None, **transform_args: Any) -> Any:  # noqa: ANN401
         """Transform the input data using a custom method.
 
@@ -62,21 +72,56 @@ class TransformationBlock(Transformer, Cacher):
         :param cache_args: The cache arguments.
         :return: The transformed data.
         """
-        if cache_args and self.cache_exists(
-            name=self.get_hash(),
-            cache_args=cache_args,
-        ):
+        if not cache_args:
+            return self.custom_transform(data, **transform_args)
+
+        name = self._get_cache_name(data, cache_args)
+        in_memory = cache_args.get("in_memory", False)
+        # Caches of the same block are told apart by their location, e.g. for train and test data
+        memory_key = (name, cache_args["storage_type"], cache_args["storage_path"], cache_args["output_data_type"])
+        if in_memory and memory_key in self._memory_cache:
             self.log_to_terminal(
-                f"Cache exists for {self.__class__} with hash: {self.get_hash()}. Using the cache.",
+                f"Cache exists in memory for {self.__class__} with hash: {name}. Using the cache.",
             )
-            return self._get_cache(name=self.get_hash(), cache_args=cache_args)
+            self._memory_cache.move_to_end(memory_key)
+            return self._memory_cache[memory_key]
 
-        data = self.custom_transform(data, **transform_args)
-        if cache_args:
+        if self.cache_exists(name=name, cache_args=cache_args):
+            self.log_to_terminal(
+                f"Cache exists for {self.__class__} with hash: {name}. Using the cache.",
+            )
+            data = self._get_cache(name=name, cache_args=cache_args)
+        else:
+            data = self.custom_transform(data, **transform_args)
             self.log_to_terminal(f"Storing cache to {cache_args['storage_path']}")
-            self._store_cache(name=self.get_hash(), data=data, cache_args=cache_args)
+            stored_data = self._store_cache(name=name, data=data, cache_args=cache_args, background=cache_args.get("store_in_background", False))
+            if stored_data is not None:
+                data = stored_data
+            elif cache_args["output_data_type"] == "dask_array" and cache_args["storage_type"] in {".npy", ".npy_stack", ".zarr"}:
+                # Continue from the stored data, so the lazy upstream graph is not computed a second time downstream.
+                # Only lossless array formats are reloaded, others would change the chunk sizes or index of the result.
+                data = self._get_cache(name=name, cache_args=cache_args)
+
+        if in_memory:
+            self._memory_cache[memory_key] = data
+            if len(self._memory_cache) > MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
         return data
 
+    def _get_cache_name(self, data: Any, cache_args: CacheArgs) -> str:  # noqa: ANN401
+        """Get the name of the cache, which includes a fingerprint of the input data if fingerprint_input is set.
+
+        :param data: The input data.
+        :param cache_args: The cache arguments.
+        :return: The name of the cache.
+        """
+        if not cache_args.get("fingerprint_input", False):
+            return self.get_hash()
+
+        # Dask collections carry a deterministic token of their graph, so they do not have to be computed
+        fingerprint = str(data.__dask_tokenize__()) if hasattr(data, "__dask_tokenize__") else hash(data)
+        return hashlib.blake2b((self.get_hash() + fingerprint).encode(), digest_size=16).hexdigest()
+
     @abstractmethod
     def custom_transform(self, data: Any, **transform_args: Any) -> Any:  # noqa: ANN401
         """Transform the input data using a custom method.
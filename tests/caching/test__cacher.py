@@ -1,3 +1,6 @@
+import asyncio
+import threading
+
 import dask.array as da
 import dask.dataframe as dd
 import numpy as np
@@ -14,6 +17,27 @@ class Implemented_Cacher(Cacher, Logger):
     pass
 
 
+# Blocks of _blocked wait for this event, so that a write can be released before its chunks are written
+_release_blocks = threading.Event()
+
+
+def _blocked(block: np.ndarray) -> np.ndarray:
+    _release_blocks.wait(timeout=30)
+    return block
+
+
+async def _wait_for_forgotten_tasks(dask_scheduler) -> None:
+    # The scheduler forgets the tasks of released futures asynchronously
+    while dask_scheduler.tasks:
+        await asyncio.sleep(0.01)
+
+
+async def _wait_for_idle_worker(dask_worker) -> None:
+    # Cancelled tasks keep running on the worker until they return
+    while dask_worker.state.executing:
+        await asyncio.sleep(0.01)
+
+
 class Test_Cacher:
     cache_path = TEMP_DIR
 
@@ -97,6 +121,16 @@ class Test_Cacher:
             is True
         )
 
+    def test__cache_exists_storage_type_feather(self):
+        c = Implemented_Cacher()
+        assert (
+            c.cache_exists(
+                "test",
+                {"storage_type": ".feather", "storage_path": f"{self.cache_path}"},
+            )
+            is False
+        )
+
     def test__cache_exists_storage_type_npy_stack(self):
         c = Implemented_Cacher()
         assert (
@@ -107,16 +141,54 @@ class Test_Cacher:
             is False
         )
 
-    def test__cache_exists_storage_type_npy_stack_exists(self):
+    def test__cache_exists_storage_type_npy_stack_incomplete(self):
         c = Implemented_Cacher()
-        with open(self.cache_path / "test", "w") as f:
+        # A stack without metadata sidecar was not completely written
+        (self.cache_path / "test").mkdir()
+        with open(self.cache_path / "test" / "info", "w") as f:
             f.write("test")
         assert (
             c.cache_exists(
                 "test",
                 {"storage_type": ".npy_stack", "storage_path": f"{self.cache_path}"},
             )
-            is True
+            is False
+        )
+
+    def test__cache_exists_storage_type_npy_stack_other_name(self):
+        c = Implemented_Cacher()
+        (self.cache_path / "test").mkdir()
+        with open(self.cache_path / "test" / ".meta.json", "w") as f:
+            f.write('{"name": "other"}')
+        assert (
+            c.cache_exists(
+                "test",
+                {"storage_type": ".npy_stack", "storage_path": f"{self.cache_path}"},
+            )
+            is False
+        )
+
+    def test__cache_exists_storage_type_zarr(self):
+        c = Implemented_Cacher()
+        assert (
+            c.cache_exists(
+                "test",
+                {"storage_type": ".zarr", "storage_path": f"{self.cache_path}"},
+            )
+            is False
+        )
+
+    def test__cache_exists_storage_type_zarr_incomplete(self):
+        pytest.importorskip("zarr")
+        c = Implemented_Cacher()
+        # to_zarr writes the array metadata before any chunk, so only the sidecar marks a complete write
+        da.ones((10, 10), chunks=(5, 5)).to_zarr(f"{self.cache_path}/test.zarr", compute=False)
+        assert (
+            c.cache_exists(
+                "test",
+                {"storage_type": ".zarr", "storage_path": f"{self.cache_path}"},
+            )
+            is False
         )
 
     def test__cache_exists_storage_type_pkl(self):
@@ -421,6 +493,41 @@ class Test_Cacher:
                 },
             )
 
+    # storage type .feather
+    def test__store_cache_storage_type_feather_output_data_type_pandas_dataframe(self):
+        c = Implemented_Cacher()
+        # Pandas dataframe
+        data = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
+        c._store_cache(
+            "test",
+            data,
+            {
+                "storage_type": ".feather",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "pandas_dataframe",
+            },
+        )
+        assert (
+            c.cache_exists(
+                "test",
+                {"storage_type": ".feather", "storage_path": f"{self.cache_path}"},
+            )
+            is True
+        )
+
+    def test__store_cache_storage_type_feather_output_data_type_unsupported(self):
+        c = Implemented_Cacher()
+        with pytest.raises(ValueError):
+            c._store_cache(
+                "test",
+                "test",
+                {
+                    "storage_type": ".feather",
+                    "storage_path": f"{self.cache_path}",
+                    "output_data_type": "numpy_array",
+                },
+            )
+
     # storage type .npy_stack
     def test__store_cache_storage_type_npy_stack_output_data_type_dask_array(self):
         c = Implemented_Cacher()
@@ -456,6 +563,111 @@ class Test_Cacher:
                 },
             )
 
+    # storage type .zarr
+    def test__store_cache_storage_type_zarr_output_data_type_dask_array(self):
+        pytest.importorskip("zarr")
+        c = Implemented_Cacher()
+        # Dask array
+        data = da.ones((1000, 1000), chunks=(100, 100))
+        c._store_cache(
+            "test",
+            data,
+            {
+                "storage_type": ".zarr",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "dask_array",
+            },
+        )
+        assert (
+            c.cache_exists(
+                "test",
+                {"storage_type": ".zarr", "storage_path": f"{self.cache_path}"},
+            )
+            is True
+        )
+
+    def test__store_cache_storage_type_zarr_output_data_type_dask_array_background(self):
+        pytest.importorskip("zarr")
+        distributed = pytest.importorskip("distributed")
+        c = Implemented_Cacher()
+        cache_args = {
+            "storage_type": ".zarr",
+            "storage_path": f"{self.cache_path}",
+            "output_data_type": "dask_array",
+        }
+        # Dask array
+        data = da.random.random((1000, 1000), chunks=(100, 100))
+        with distributed.Client(processes=False, dashboard_address=None):
+            stored = c._store_cache("test", data, cache_args, background=True)
+            assert np.array_equal(stored.compute(), data.compute())
+            assert c.cache_exists("test", cache_args) is True
+        assert np.array_equal(c._get_cache("test", cache_args).compute(), data.compute())
+
+    def test__store_cache_storage_type_zarr_output_data_type_dask_array_distributed_discarded(self):
+        pytest.importorskip("zarr")
+        distributed = pytest.importorskip("distributed")
+        c = Implemented_Cacher()
+        cache_args = {
+            "storage_type": ".zarr",
+            "storage_path": f"{self.cache_path}",
+            "output_data_type": "dask_array",
+        }
+
+        _release_blocks.clear()
+        data = da.ones((20, 20), chunks=(10, 10)).map_blocks(_blocked, meta=np.empty((0, 0)))
+        with distributed.Client(processes=False, dashboard_address=None) as client:
+            # Callers that discard the return value get a complete cache
+            _release_blocks.set()
+            c._store_cache("test", data, cache_args)
+            assert c.cache_exists("test", cache_args) is True
+            assert c._get_cache("test", cache_args).sum().compute() == 400
+
+            # A background write that is released before its chunks are written is cancelled
+            _release_blocks.clear()
+            c._store_cache("test_background", data, cache_args, background=True)
+            assert c.cache_exists("test_background", cache_args) is False
+            client.run_on_scheduler(_wait_for_forgotten_tasks)
+            _release_blocks.set()
+            client.run(_wait_for_idle_worker)
+            assert c.cache_exists("test_background", cache_args) is False
+
+            # The next store overwrites the partial store
+            stored = c._store_cache("test_background", data, cache_args, background=True)
+            assert stored.sum().compute() == 400
+        assert c.cache_exists("test_background", cache_args) is True
+        assert c._get_cache("test_background", cache_args).sum().compute() == 400
+
+    @pytest.mark.parametrize("output_data_type", ["dask_array", "numpy_array"])
+    def test__store_cache_storage_type_zarr_over_incomplete(self, output_data_type):
+        pytest.importorskip("zarr")
+        c = Implemented_Cacher()
+        cache_args = {
+            "storage_type": ".zarr",
+            "storage_path": f"{self.cache_path}",
+            "output_data_type": output_data_type,
+        }
+        # An interrupted write leaves the array metadata without sidecar
+        da.zeros((10, 10), chunks=(5, 5)).to_zarr(f"{self.cache_path}/test.zarr", compute=False)
+        assert c.cache_exists("test", cache_args) is False
+
+        data = np.ones((10, 10)) if output_data_type == "numpy_array" else da.ones((10, 10), chunks=(5, 5))
+        c._store_cache("test", data, cache_args)
+        assert c.cache_exists("test", cache_args) is True
+        assert c._get_cache("test", cache_args).sum() == 100
+
+    def test__store_cache_storage_type_zarr_output_data_type_unsupported(self):
+        c = Implemented_Cacher()
+        with pytest.raises(ValueError):
+            c._store_cache(
+                "test",
+                "test",
+                {
+                    "storage_type": ".zarr",
+                    "storage_path": f"{self.cache_path}",
+                    "output_data_type": "pandas_dataframe",
+                },
+            )
+
     def test__store_cache_storage_type_unsupported(self):
         c = Implemented_Cacher()
         with pytest.raises(ValueError):
@@ -812,6 +1024,65 @@ class Test_Cacher:
                 },
             )
 
+    # storage type .feather
+    def test__get_cache_storage_type_feather_output_data_type_pandas_dataframe(self):
+        c = Implemented_Cacher()
+        # Pandas dataframe
+        data = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
+        c._store_cache(
+            "test",
+            data,
+            {
+                "storage_type": ".feather",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "pandas_dataframe",
+            },
+        )
+        get_cache = c._get_cache(
+            "test",
+            {
+                "storage_type": ".feather",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "pandas_dataframe",
+            },
+        )
+        assert get_cache.equals(data)
+
+    def test__get_cache_storage_type_feather_output_data_type_polars_dataframe(self):
+        c = Implemented_Cacher()
+        # Polars dataframe
+        data = pl.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
+        c._store_cache(
+            "test",
+            data,
+            {
+                "storage_type": ".feather",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "polars_dataframe",
+            },
+        )
+        get_cache = c._get_cache(
+            "test",
+            {
+                "storage_type": ".feather",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "polars_dataframe",
+            },
+        )
+        assert get_cache.equals(data)
+
+    def test__get_cache_storage_type_feather_output_data_type_unsupported(self):
+        c = Implemented_Cacher()
+        with pytest.raises(ValueError):
+            c._get_cache(
+                "test",
+                {
+                    "storage_type": ".feather",
+                    "storage_path": f"{self.cache_path}",
+                    "output_data_type": "numpy_array",
+                },
+            )
+
     # storage type .npy_stack
     def test__get_cache_storage_type_npy_stack_output_data_type_dask_array(self):
         c = Implemented_Cacher()
@@ -848,6 +1119,67 @@ class Test_Cacher:
                 },
             )
 
+    # storage type .zarr
+    def test__get_cache_storage_type_zarr_output_data_type_dask_array(self):
+        pytest.importorskip("zarr")
+        c = Implemented_Cacher()
+        # Dask array
+        data = da.random.random((1000, 1000), chunks=(100, 100))
+        c._store_cache(
+            "test",
+            data,
+            {
+                "storage_type": ".zarr",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "dask_array",
+            },
+        )
+        get_cache = c._get_cache(
+            "test",
+            {
+                "storage_type": ".zarr",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "dask_array",
+            },
+        )
+        assert np.array_equal(get_cache.compute(), data.compute())
+
+    def test__get_cache_storage_type_zarr_output_data_type_numpy_array(self):
+        pytest.importorskip("zarr")
+        c = Implemented_Cacher()
+        # Numpy array
+        data = np.random.rand(100, 100)
+        c._store_cache(
+            "test",
+            data,
+            {
+                "storage_type": ".zarr",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "numpy_array",
+            },
+        )
+        get_cache = c._get_cache(
+            "test",
+            {
+                "storage_type": ".zarr",
+                "storage_path": f"{self.cache_path}",
+                "output_data_type": "numpy_array",
+            },
+        )
+        assert np.array_equal(get_cache, data)
+
+    def test__get_cache_storage_type_zarr_output_data_type_unsupported(self):
+        c = Implemented_Cacher()
+        with pytest.raises(ValueError):
+            c._get_cache(
+                "test",
+                {
+                    "storage_type": ".zarr",
+                    "storage_path": f"{self.cache_path}",
+                    "output_data_type": "pandas_dataframe",
+                },
+            )
+
     def test__get_cache_storage_type_unsupported(self):
         c = Implemented_Cacher()
         with pytest.raises(ValueError):
@@ -1,6 +1,12 @@
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
 import torch
 
 from epochalyst.training.augmentation import utils
+from epochalyst.training.augmentation.time_series_augmentations import RandomAmplitudeShift
 
 
 def set_torch_seed(seed: int = 42) -> None:
@@ -47,6 +53,72 @@ class TestUtils:
         assert torch.all(augmented_x == x + 2)
         assert torch.all(augmented_y == y + 1)
 
+    def test_custom_sequential_scripted(self):
+        sequential = utils.CustomSequential(x_transforms=[torch.nn.ReLU(), torch.nn.Hardtanh(-2.0, 2.0)], script=True)
+        assert sequential._x_sequential is not None
+
+        x = torch.linspace(-3, 3, 100)
+        y = torch.zeros(32, 1)
+        augmented_x, augmented_y = sequential(x, y)
+
+        assert torch.all(augmented_x == torch.clamp(x, 0, 2))
+        assert torch.all(augmented_y == y)
+
+        # The scripted module is not pickled, but scripted again when unpickling
+        unpickled = pickle.loads(pickle.dumps(sequential))
+        assert unpickled._x_sequential is not None
+        assert torch.all(unpickled(x, y)[0] == augmented_x)
+
+    def test_custom_sequential_not_scriptable(self):
+        # RandomAmplitudeShift overrides __call__ instead of forward, so scripting fails and the loop is used
+        shift = RandomAmplitudeShift(p=1.0)
+        sequential = utils.CustomSequential(x_transforms=[utils.NoOp(), shift], script=True)
+        assert sequential._x_sequential is None
+
+        x = torch.rand(32, 1, 100)
+        y = torch.zeros(32, 1)
+        set_torch_seed(42)
+        expected_x = shift(x)
+        set_torch_seed(42)
+        augmented_x, augmented_y = sequential(x, y)
+
+        assert torch.allclose(augmented_x, expected_x)
+        assert not torch.allclose(augmented_x, x)
+        assert torch.all(augmented_y == y)
+
+    def test_custom_sequential_not_scripted_by_default(self):
+        drop = torch.nn.Dropout(p=0.5)
+        sequential = utils.CustomSequential(x_transforms=[drop])
+        assert sequential._x_sequential is None
+
+        # The given instances are used, so switching them to eval mode disables the dropout
+        drop.eval()
+        x = torch.ones(1000)
+        y = torch.zeros(1)
+        augmented_x, augmented_y = sequential(x, y)
+
+        assert torch.all(augmented_x == x)
+        assert torch.all(augmented_y == y)
+
+    def test_custom_sequential_eq(self):
+        x_transforms = [torch.nn.ReLU()]
+        assert utils.CustomSequential(x_transforms=x_transforms) == utils.CustomSequential(x_transforms=x_transforms)
+
+    def test_custom_sequential_no_op(self):
+        class DummyXStep:
+            def __call__(self, x: torch.Tensor):
+                return x + 1
+
+        sequential = utils.CustomSequential(x_transforms=[utils.NoOp(), DummyXStep(), utils.NoOp()])
+        assert len(sequential._active_x_transforms) == 1
+
+        x = torch.ones(32, 1, 100)
+        y = torch.zeros(32, 1)
+        augmented_x, augmented_y = sequential(x, y)
+
+        assert torch.all(augmented_x == x + 1)
+        assert torch.all(augmented_y == y)
+
     def test_custom_apply_one(self):
         class DummyXStep:
             def __init__(self, p):
@@ -63,6 +135,7 @@ class TestUtils:
                 return x, y + 1
 
         set_torch_seed(42)
+        np.random.seed(42)
         step1 = DummyXStep(p=0.33)
         step2 = DummyXStep(p=0.33)
         step3 = DummyXYStep(p=0.33)
@@ -82,10 +155,34 @@ class TestUtils:
         augmented_y = y
         for _ in range(10000):
             augmented_x, augmented_y = apply_one(augmented_x, augmented_y)
-        # Assert that the xy transform is applied roughly 1/3 of the time
-        assert torch.all(3300 <= augmented_y) & torch.all(augmented_y <= 3366)
-        # Assert that the x transform is applied roughly 2/3 of the time
-        assert torch.all(6633 <= augmented_x) & torch.all(augmented_x <= 6700)
+        # Assert that the xy transform is applied roughly 1/3 of the time (within 3 standard deviations)
+        assert torch.all(3192 <= augmented_y) & torch.all(augmented_y <= 3474)
+        # Assert that the x transform is applied roughly 2/3 of the time (within 3 standard deviations)
+        assert torch.all(6526 <= augmented_x) & torch.all(augmented_x <= 6808)
+
+    def test_custom_apply_one_empty(self):
+        apply_one = utils.CustomApplyOne()
+
+        assert apply_one.all_transforms == ()
+        assert apply_one._cdf == ()
+
+    def test_custom_apply_one_no_op(self):
+        class DummyXStep:
+            def __init__(self, p):
+                self.p = p
+
+            def __call__(self, x: torch.Tensor):
+                return x + 1
+
+        np.random.seed(42)
+        apply_one = utils.CustomApplyOne(x_transforms=[utils.NoOp(p=0.5), DummyXStep(p=0.5)])
+
+        augmented_x = torch.zeros(1)
+        augmented_y = torch.zeros(1)
+        for _ in range(10000):
+            augmented_x, augmented_y = apply_one(augmented_x, augmented_y)
+        # Assert that the NoOp keeps its probability of being selected
+        assert 4850 <= augmented_x.item() <= 5150
 
     def test_audiomentations_compose(self):
         compose = utils.get_audiomentations().Compose([])
@@ -95,6 +192,46 @@ class TestUtils:
 
         assert torch.all(augmented_x == x)
 
+    def test_audiomentations_compose_parallel(self):
+        audiomentations = utils.get_audiomentations()
+        compose = audiomentations.Compose([audiomentations.Gain(min_gain_db=-12, max_gain_db=12, p=1.0)])
+        transformer = utils.AudiomentationsCompose(compose=compose, parallel=True)
+        x = torch.rand(32, 1, 100) + 0.5
+        augmented_x = transformer(x)
+
+        assert augmented_x.shape == x.shape
+        # Every sample is scaled by its own random gain
+        gains = augmented_x / x
+        assert torch.allclose(gains, gains[:, :, :1], atol=1e-5)
+        assert torch.all((10 ** (-12 / 20) - 1e-5 <= gains) & (gains <= 10 ** (12 / 20) + 1e-5))
+        assert len(torch.unique(gains[:, 0, 0])) > 1
+        # The threads augment with their own copies, so the compose itself is never used
+        assert len(transformer._thread_composes) >= 1
+        assert compose.transforms[0].parameters["should_apply"] is None
+
+    def test_audiomentations_compose_parallel_fork(self):
+        ctx = multiprocessing.get_context("fork")
+        transformer = utils.AudiomentationsCompose(compose=utils.get_audiomentations().Compose([]), parallel=True)
+        x = torch.rand(4, 1, 100)
+        transformer(x)
+
+        # A forked child can still use the parallel compose after the parent did
+        process = ctx.Process(target=transformer, args=(x,))
+        process.start()
+        process.join(timeout=30)
+        if process.is_alive():
+            process.kill()
+        assert process.exitcode == 0
+
+    def test_audiomentations_compose_gpu_backend(self):
+        pytest.importorskip("torch_audiomentations")
+        compose = utils.get_torch_audiomentations().Compose([], output_type="tensor")
+        transformer = utils.AudiomentationsCompose(compose=compose, backend="gpu")
+        x = torch.rand(32, 1, 100)
+        augmented_x = transformer(x)
+
+        assert torch.all(augmented_x == x)
+
     def test_audiomentations_compose_repr(self):
         compose = utils.get_audiomentations().Compose([])
         transformer = utils.AudiomentationsCompose(compose=compose)
@@ -3,6 +3,7 @@ import shutil
 from pathlib import Path
 from unittest import mock
 
+import dask.array as da
 import numpy as np
 import pytest
 
@@ -82,3 +83,151 @@ class TestTransformationBlock:
 
         assert tb.transform(np.array([1]), cache_args=cache_args) == np.array([2])
         assert tb.transform(np.array([1]), cache_args=cache_args) == np.array([2])
+
+    def test_tb_custom_transform_implementation_with_cache_fingerprint_input(self, setup_temp_dir):
+        class TestTransformationBlockImpl(TransformationBlock):
+            def custom_transform(self, data: np.ndarray[int], **transform_args) -> int:
+                return data * 2
+
+            def log_to_debug(self, message: str) -> None:
+                return None
+
+            def log_to_terminal(self, message: str) -> None:
+                return None
+
+        tb = TestTransformationBlockImpl()
+        cache_args = {
+            "output_data_type": "numpy_array",
+            "storage_type": ".npy",
+            "storage_path": f"{self.cache_path}",
+            "fingerprint_input": True,
+        }
+
+        assert tb.transform(np.array([1]), cache_args=cache_args) == np.array([2])
+        assert tb.transform(np.array([2]), cache_args=cache_args) == np.array([4])
+        assert tb.transform(np.array([1]), cache_args=cache_args) == np.array([2])
+
+    def test_tb_custom_transform_implementation_with_cache_dask_array(self, setup_temp_dir):
+        class TestTransformationBlockImpl(TransformationBlock):
+            def custom_transform(self, data: da.Array, **transform_args) -> da.Array:
+                return data * 2
+
+            def log_to_debug(self, message: str) -> None:
+                return None
+
+            def log_to_terminal(self, message: str) -> None:
+                return None
+
+        tb = TestTransformationBlockImpl()
+        cache_args = {
+            "output_data_type": "dask_array",
+            "storage_type": ".npy_stack",
+            "storage_path": f"{self.cache_path}",
+        }
+
+        data = tb.transform(da.ones((10, 10), chunks=(5, 5)), cache_args=cache_args)
+        # The returned array reads the stored chunks instead of recomputing the transform
+        assert data.name.startswith("from-npy-stack")
+        assert np.array_equal(data.compute(), np.full((10, 10), 2))
+
+    def test_tb_custom_transform_implementation_with_cache_dask_array_parquet(self, setup_temp_dir):
+        class TestTransformationBlockImpl(TransformationBlock):
+            def custom_transform(self, data: da.Array, **transform_args) -> da.Array:
+                return data * 2
+
+            def log_to_debug(self, message: str) -> None:
+                return None
+
+            def log_to_terminal(self, message: str) -> None:
+                return None
+
+        tb = TestTransformationBlockImpl()
+        cache_args = {
+            "output_data_type": "dask_array",
+            "storage_type": ".parquet",
+            "storage_path": f"{self.cache_path}",
+        }
+
+        # Parquet loses the chunk sizes, so the transformed data itself is returned instead of the reloaded cache
+        data = tb.transform(da.ones((10, 3), chunks=(5, 3)), cache_args=cache_args)
+        assert data.shape == (10, 3)
+        assert np.array_equal(data.compute(), np.full((10, 3), 2))
+
+    def test_tb_custom_transform_implementation_with_cache_zarr_in_background(self, setup_temp_dir):
+        pytest.importorskip("zarr")
+        distributed = pytest.importorskip("distributed")
+
+        class TestTransformationBlockImpl(TransformationBlock):
+            def custom_transform(self, data: da.Array, **transform_args) -> da.Array:
+                return data * 2
+
+            def log_to_debug(self, message: str) -> None:
+                return None
+
+            def log_to_terminal(self, message: str) -> None:
+                return None
+
+        tb = TestTransformationBlockImpl()
+        cache_args = {
+            "output_data_type": "dask_array",
+            "storage_type": ".zarr",
+            "storage_path": f"{self.cache_path}",
+            "store_in_background": True,
+        }
+
+        with distributed.Client(processes=False, dashboard_address=None):
+            data = tb.transform(da.ones((10, 10), chunks=(5, 5)), cache_args=cache_args)
+            # The returned array reads the stored chunks once the write is complete
+            assert np.array_equal(data.compute(), np.full((10, 10), 2))
+            assert tb.cache_exists(tb.get_hash(), cache_args) is True
+
+    def test_tb_custom_transform_implementation_with_cache_in_memory(self, setup_temp_dir):
+        class TestTransformationBlockImpl(TransformationBlock):
+            def custom_transform(self, data: np.ndarray[int], **transform_args) -> int:
+                return data * 2
+
+            def log_to_debug(self, message: str) -> None:
+                return None
+
+            def log_to_terminal(self, message: str) -> None:
+                return None
+
+        tb = TestTransformationBlockImpl()
+        cache_args = {
+            "output_data_type": "numpy_array",
+            "storage_type": ".npy",
+            "storage_path": f"{self.cache_path}",
+            "in_memory": True,
+        }
+
+        data = tb.transform(np.array([1]), cache_args=cache_args)
+        # The second call is served from memory, so it does not need the file on disk
+        shutil.rmtree(self.cache_path)
+        with mock.patch.object(tb, "custom_transform") as custom_transform:
+            assert tb.transform(np.array([1]), cache_args=cache_args) is data
+            custom_transform.assert_not_called()
+
+    def test_tb_custom_transform_implementation_with_cache_in_memory_storage_path(self, setup_temp_dir):
+        class TestTransformationBlockImpl(TransformationBlock):
+            def custom_transform(self, data: np.ndarray[int], **transform_args) -> int:
+                return data * 2
+
+            def log_to_debug(self, message: str) -> None:
+                return None
+
+            def log_to_terminal(self, message: str) -> None:
+                return None
+
+        tb = TestTransformationBlockImpl()
+        (self.cache_path / "train").mkdir()
+        (self.cache_path / "test").mkdir()
+        cache_args = {
+            "output_data_type": "numpy_array",
+            "storage_type": ".npy",
+            "storage_path": f"{self.cache_path}/train",
+            "in_memory": True,
+        }
+
+        assert tb.transform(np.array([1]), cache_args=cache_args) == np.array([2])
+        # A cache at another location is not served from memory
+        assert tb.transform(np.array([5]), cache_args={**cache_args, "storage_path": f"{self.cache_path}/test"}) == np.array([10])